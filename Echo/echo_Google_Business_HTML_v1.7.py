@@ -29,22 +29,220 @@
 # - LLM-based insight generation and client dashboard features
 # - Web-hosted SaaS version with UX redesign
 #
-import time
 import os
 import re
+import json
+import csv
+import io
+import atexit
+import shutil
+import hashlib
+import threading
 import streamlit as st
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 import undetected_chromedriver as uc
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import pandas as pd
-from datetime import datetime
-import urllib.request
+from datetime import datetime, timedelta
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from drive_uploader import upload_file_to_drive
+
+# Temporary folder for downloaded review images (removed once they are zipped)
+IMAGE_DIR = os.path.join("exports", "google", "images")
+
+# Persistent cache of downloaded review photos, keyed by a hash of their URL path, so reruns skip the network
+IMAGE_CACHE_DIR = os.path.join("exports", "google", "image_cache")
+# Concurrent photo downloads (and pooled connections) per run
+IMAGE_WORKERS = 16
+
+# CSV schema, in export order
+REVIEW_COLUMNS = [
+    "ReviewUID",
+    "Reviewer",
+    "Rating",
+    "RatingValue",
+    "DateRaw",
+    "DateParsed",
+    "DateParseSuccess",
+    "Review",
+    "ImageCount",
+    "ImageFiles",
+    "LikeCount",
+    "Services",
+    "PositiveTags",
+    "NegativeTags",
+    "PriceTags",
+    "OwnerResponded",
+    "ClientName",
+]
+
+# One unit of each relative review date ("3 weeks ago"), built once; months and years are approximated
+_UNIT_DELTAS = {"day": timedelta(days=1), "week": timedelta(days=7), "month": timedelta(days=30), "year": timedelta(days=365)}
+
+# Explicit junk triggers for the structural fallback (the first two are Maps icon-font glyphs)
+_JUNK_KEYWORDS = ("", "", "New", "Updated", "stars", "reviews")
+
+# Regexes compiled once at import rather than looked up in re's cache on every call
+_RELATIVE_DATE_RE = re.compile(r'(\d+)\s+(day|week|month|year)')
+_RATING_RE = re.compile(r'\d')
+_ALPHA_RE = re.compile(r'[a-zA-Z]')
+_NONWORD_RE = re.compile(r'[^\w]')
+_JUNK_RE = re.compile(r"[^a-zA-Z0-9\s.,!?']")
+_UNSAFE_FILENAME_RE = re.compile(r'[^a-zA-Z0-9_\-]')
+
+# Collects every unique review card's fields in one in-page pass, instead of several WebDriver round-trips per card
+REVIEW_HARVEST_JS = r"""
+const results = [];
+const seenIds = new Set();
+document.querySelectorAll('div[data-review-id]').forEach(card => {
+    // Nested elements repeat their card's id; keep only the first (outermost) card per review
+    const id = card.getAttribute('data-review-id');
+    if (!id || seenIds.has(id)) return;
+    seenIds.add(id);
+    const textOf = (selector) => {
+        const el = card.querySelector(selector);
+        return el ? el.innerText : "";
+    };
+    const ratingEl = card.querySelector('.kvMYJc');
+    // First review-text span that is not part of an owner reply
+    const reviewSpan = Array.from(card.querySelectorAll('.wiI7pd')).find(span => !span.closest('div.CDe7pd'));
+    // Review photo URLs from the buttons' background-image styles, quoted or unquoted
+    const imageUrls = [];
+    card.querySelectorAll('div.KtCyie > button[style*="background-image"]').forEach(btn => {
+        const match = btn.style.backgroundImage.match(/url\(["']?(https[^"')]+)["']?\)/);
+        if (match && match[1].includes('googleusercontent')) imageUrls.push(match[1]);
+    });
+    // Structured tags: each label span (Services/Positive/Negative/Price) applies to the spans after it
+    const tags = {services: [], positive: [], negative: [], price: []};
+    const unlabeledTags = [];
+    let label = "";
+    card.querySelectorAll('.RfDO5c').forEach(span => {
+        const text = span.innerText.trim();
+        const lowered = text.toLowerCase();
+        if (Object.hasOwn(tags, lowered)) {
+            label = lowered;
+        } else if (label) {
+            tags[label].push(text);
+        } else {
+            unlabeledTags.push(text);
+        }
+    });
+    results.push({
+        id: id,
+        reviewer: textOf('.d4r55'),
+        rating: ratingEl ? ratingEl.getAttribute('aria-label') : "",
+        date: textOf('.rsqaWe'),
+        text: reviewSpan ? reviewSpan.innerText : "",
+        likes: textOf('.pkWtMe'),
+        images: imageUrls,
+        tags: tags,
+        unlabeledTags: unlabeledTags,
+        owner: card.querySelector('.CDe7pd') !== null,
+    });
+});
+return JSON.stringify(results);
+"""
+
+# Resolves with the first element matching a selector, either immediately or once a DOM mutation adds it
+WAIT_FOR_SELECTOR_JS = """
+const [selector, timeoutMs, done] = arguments;
+const existing = document.querySelector(selector);
+if (existing) {
+    done(existing);
+} else {
+    const observer = new MutationObserver(() => {
+        const el = document.querySelector(selector);
+        if (el) {
+            observer.disconnect();
+            done(el);
+        }
+    });
+    // Class changes count too: an existing element can start matching the selector without being re-inserted
+    observer.observe(document, {subtree: true, childList: true, attributes: true, attributeFilter: ['class']});
+    // Stop observing once Selenium has given up on the script
+    setTimeout(() => observer.disconnect(), timeoutMs);
+}
+"""
+
+# Scrolls the reviews panel in-page, scrolling again as soon as new review cards arrive. A round of stableMs
+# without new cards scrolls again and counts as stable; the callback gets the card count after stableRounds
+# stable rounds in a row (or once the scroll cap / overall deadline is reached)
+SCROLL_REVIEWS_JS = """
+const [panel, stableMs, stableRounds, maxScrolls, deadlineMs, done] = arguments;
+const countCards = () => document.querySelectorAll('[data-review-id]').length;
+const deadline = Date.now() + deadlineMs;
+let scrolls = 0;
+const step = (stable) => {
+    if (stable >= stableRounds || scrolls >= maxScrolls || Date.now() >= deadline) {
+        done(countCards());
+        return;
+    }
+    const before = countCards();
+    panel.scrollTo(0, panel.scrollHeight);
+    scrolls++;
+    const observer = new MutationObserver(() => {
+        if (countCards() > before) {
+            observer.disconnect();
+            clearTimeout(timer);
+            step(0);
+        }
+    });
+    // No new cards this round: nudge the panel again in case Maps ignored the last scroll
+    const timer = setTimeout(() => {
+        observer.disconnect();
+        step(stable + 1);
+    }, Math.min(stableMs, Math.max(0, deadline - Date.now())));
+    observer.observe(panel, {subtree: true, childList: true});
+};
+step(0);
+"""
+
+# Clicks every "More" button at once, then calls back with how many are left as soon as none remain
+# (watched with a MutationObserver) or after timeoutMs
+EXPAND_REVIEWS_JS = """
+const [timeoutMs, done] = arguments;
+const remaining = () => document.querySelectorAll('button.w8nwRe').length;
+document.querySelectorAll('button.w8nwRe').forEach(btn => btn.click());
+if (!remaining()) {
+    done(0);
+} else {
+    const finish = () => {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(remaining());
+    };
+    const observer = new MutationObserver(() => {
+        if (!remaining()) finish();
+    });
+    const timer = setTimeout(finish, timeoutMs);
+    observer.observe(document.body, {subtree: true, childList: true, attributes: true});
+}
+"""
+
+# Visible text nodes of a review container outside the owner reply block, each collected once by a TreeWalker
+STRUCTURAL_TEXTS_JS = """
+const card = document.querySelector(`div[data-review-id="${CSS.escape(arguments[0])}"]`);
+const rating = card && card.querySelector('.kvMYJc');
+const container = rating && rating.parentElement.closest('div[data-review-id]');
+if (!container) return [];
+const owner = container.querySelector('.CDe7pd');
+const walker = document.createTreeWalker(container, NodeFilter.SHOW_TEXT);
+const texts = [];
+let node;
+while ((node = walker.nextNode())) {
+    if (owner && owner.contains(node)) continue;
+    if (!node.parentElement.getClientRects().length) continue;  // Text inside hidden elements is not visible
+    const text = node.nodeValue.trim();
+    if (text) texts.push(text);
+}
+return texts;
+"""
+
+
 def clean_final_text(raw_text):
     if not raw_text:
         return ""
@@ -54,15 +252,153 @@ def clean_final_text(raw_text):
     return raw_text.strip()
 
 
+def parse_relative_date(date_text, today):
+    match = _RELATIVE_DATE_RE.search(date_text)
+    if not match:
+        return ""
+    return today - int(match.group(1)) * _UNIT_DELTAS[match.group(2)]
+
+
+def fetch_image(session, img_url, image_path):
+    # Download one photo over the shared pooled session; returns the saved path, or None on failure.
+    # Photos already in the on-disk cache from an earlier run are copied instead of downloaded again
+    # Key by the URL's invariant part: googleusercontent appends size/crop options after "=", which can change between visits
+    cache_key = hashlib.blake2b(img_url.split("=", 1)[0].encode("utf-8"), digest_size=8).hexdigest()
+    cache_path = os.path.join(IMAGE_CACHE_DIR, f"{cache_key}.jpg")
+    try:
+        if not (os.path.exists(cache_path) and os.path.getsize(cache_path) > 0):
+            # Write to a private temp file first so a shared URL fetched twice never leaves a partial cache entry
+            temp_path = f"{cache_path}.{threading.get_ident()}.part"
+            try:
+                with session.get(img_url, stream=True, timeout=10) as response:
+                    response.raise_for_status()
+                    # Stream to disk in chunks rather than holding each photo in memory
+                    with open(temp_path, "wb") as f:
+                        for chunk in response.iter_content(chunk_size=1 << 16):
+                            f.write(chunk)
+                os.replace(temp_path, cache_path)
+            finally:
+                # A download that failed part-way must not stay behind in the persistent cache
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        # Never write through a stale export file: it may be a hard link to another photo's cache entry
+        try:
+            os.unlink(image_path)
+        except FileNotFoundError:
+            pass
+        try:
+            # A hard link shares the cached bytes instead of duplicating them; copy when linking is not possible
+            os.link(cache_path, image_path)
+        except OSError:
+            shutil.copyfile(cache_path, image_path)
+        return image_path
+    except Exception:
+        return None
+
+
+def open_image_session(max_workers=IMAGE_WORKERS):
+    # One keep-alive session shared by every download thread so TCP/TLS connections are reused
+    session = requests.Session()
+    # Retry dropped connections and transient 5xx errors on the pooled socket instead of losing the photo
+    retries = Retry(total=2, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+    session.mount("https://", HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers * 2, max_retries=retries))
+    return session
+
+
+def write_review_csv(f, rows):
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(REVIEW_COLUMNS)
+    writer.writerows(rows)
+
+
+def write_review_parquet(rows, path):
+    # Build the Parquet copy column by column with pyarrow straight from the row lists.
+    # Raises ImportError when pyarrow is not installed
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    labels = pa.dictionary(pa.int32(), pa.string())
+    # Counts and repeated labels fit in much smaller types than the int64/string defaults
+    schema = pa.schema([
+        ("ReviewUID", pa.string()),
+        ("Reviewer", pa.string()),
+        ("Rating", labels),
+        ("RatingValue", pa.uint8()),
+        ("DateRaw", pa.string()),
+        ("DateParsed", pa.date32()),
+        ("DateParseSuccess", pa.bool_()),
+        ("Review", pa.string()),
+        ("ImageCount", pa.uint16()),
+        ("ImageFiles", pa.string()),
+        ("LikeCount", pa.uint32()),
+        ("Services", labels),
+        ("PositiveTags", labels),
+        ("NegativeTags", labels),
+        ("PriceTags", labels),
+        ("OwnerResponded", pa.bool_()),
+        ("ClientName", pa.string()),
+    ])
+    columns = dict(zip(REVIEW_COLUMNS, map(list, zip(*rows))))
+    # Unparsed dates are "" in the CSV; Parquet needs a single column type, so they become nulls
+    columns["DateParsed"] = [value or None for value in columns["DateParsed"]]
+    pq.write_table(pa.table(columns, schema=schema), path)
+
+
+def wait_for_selector(driver, selector, timeout):
+    # Event-driven wait: returns the element as soon as a MutationObserver sees it, instead of polling every 500 ms
+    driver.set_script_timeout(timeout)
+    return driver.execute_async_script(WAIT_FOR_SELECTOR_JS, selector, timeout * 1000)
+
+
+def browser_is_alive(driver):
+    # A cached browser is only reused if its window still answers (e.g. not closed by hand)
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        # The cache drops this entry and launches a new browser, so quit the stale one instead of leaving Chrome running
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        return False
+
+
+# Held for a whole extraction: the cached browser and the export folders are shared by every Streamlit session
+@st.cache_resource(show_spinner=False)
+def extraction_lock():
+    return threading.Lock()
+
+
+# Every browser launched in this process, by headless setting, so Reset Browser can quit all of them
+@st.cache_resource(show_spinner=False)
+def launched_browsers():
+    return {}
+
+
+# One browser per headless setting is shared across Streamlit reruns, skipping Chrome startup on each run
+@st.cache_resource(show_spinner=False, validate=browser_is_alive)
 def launch_browser(headless_mode=False):
     options = uc.ChromeOptions()
     options.add_argument("--disable-blink-features=AutomationControlled")
+    # Review photos are read from the cards' background-image styles and fetched separately,
+    # so Chrome never needs to load or paint them itself
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    # Lightweight mode: nothing the scraper reads depends on the GPU, extensions, plugins or notifications
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-plugins")
+    options.add_argument("--disable-notifications")
     if headless_mode:
         options.add_argument("--headless=new")
     else:
         options.add_argument("--start-maximized")
 
     driver = uc.Chrome(options=options, use_subprocess=True)
+    atexit.register(driver.quit)
+    launched_browsers()[headless_mode] = driver
     return driver
 
 
@@ -81,9 +417,30 @@ def main():
 
     zip_and_send = st.checkbox("Also zip CSV + Images and send to Completed Reports folder", value=False)
 
+    export_parquet = st.checkbox("Also export a Parquet copy of the reviews (requires pyarrow)", value=False)
+
     # Add "Start Extraction" button below headless toggle
     start_extraction = st.button("Start Extraction")
 
+    # Quit every shared browser so the next extraction launches a fresh one; never while an extraction is using them
+    if st.button("Reset Browser"):
+        lock = extraction_lock()
+        if not lock.acquire(blocking=False):
+            st.warning("⏳ An extraction is using the browser. Reset it once the extraction finishes.")
+            return
+        try:
+            browsers = launched_browsers()
+            for previous_driver in browsers.values():
+                try:
+                    previous_driver.quit()
+                except Exception:
+                    pass  # Already closed by hand or dropped by a failed validation
+            browsers.clear()
+            launch_browser.clear()
+        finally:
+            lock.release()
+        st.info("Browser reset. A new one will launch on the next extraction.")
+
     from urllib.parse import urlparse, unquote
 
     try:
@@ -94,441 +451,308 @@ def main():
     except Exception:
         business_name = "Unknown Business"
 
-    sanitized_business_name = re.sub(r'[^a-zA-Z0-9_\-]', '_', business_name)
+    sanitized_business_name = _UNSAFE_FILENAME_RE.sub('_', business_name)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     debug_path = f"{sanitized_business_name}_debug_{timestamp}.txt"
 
     # Scraper logic runs only when the Start Extraction button is pressed
     if url and start_extraction:
-        st.info("Launching browser...")
-        driver = launch_browser(headless_mode)
-        driver.get(url)
-        # business_name is now extracted from the URL above
-        # business_name = driver.find_element(By.CLASS_NAME, 'DU9Pgb').text  # Extracted from URL instead
-        st.info("🧭 Navigating to Google Business page... Please wait while the content loads.")
-
-        try:
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CLASS_NAME, 'DU9Pgb'))  # Class for business name title
-            )
-            st.success("Page loaded successfully.")
-            st.write("Page title:", driver.title)
-        except Exception as e:
-            st.error("❌ Failed to load the page. Please check the URL or internet connection.")
-            driver.quit()
+        # Every session shares the cached browser and the image export folder, so one extraction runs at a time
+        lock = extraction_lock()
+        if not lock.acquire(blocking=False):
+            st.warning("⏳ Another extraction is already running. Please try again once it finishes.")
             return
-
-        # Attempt to scroll and collect multiple reviews
         try:
-            st.info("Scrolling to load all reviews...")
-            scrollable_div = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, '//div[contains(@class, "m6QErb") and contains(@class, "DxyBCb")]'))
-            )
-            scroll_attempts = 0
-            max_scrolls = 60  # Safety cap
-            last_review_count = 0
-            stable_scrolls = 0
-
-            while scroll_attempts < max_scrolls and stable_scrolls < 3:
-                driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight);", scrollable_div)
-                time.sleep(2.5)
-                review_cards = driver.find_elements(By.XPATH, '//div[@data-review-id]')
-                if len(review_cards) == last_review_count:
-                    stable_scrolls += 1
-                else:
-                    stable_scrolls = 0
-                last_review_count = len(review_cards)
-                scroll_attempts += 1
-
-            st.success(f"Scrolling complete. Total scroll attempts: {scroll_attempts}")
-
-            # Now extract all review cards
-            review_cards = driver.find_elements(By.XPATH, '//div[@data-review-id]')
+            st.info("Launching browser...")
+            driver = launch_browser(headless_mode)
+            driver.get(url)
+            # business_name is now extracted from the URL above
+            st.info("🧭 Navigating to Google Business page... Please wait while the content loads.")
 
-            # Expand all "More" buttons to get full text
-            more_buttons = driver.find_elements(By.XPATH, '//button[contains(@class, "w8nwRe")]')
-            for btn in more_buttons:
-                try:
-                    driver.execute_script("arguments[0].click();", btn)
-                    time.sleep(0.1)
-                except Exception:
-                    continue
-
-            # Filter duplicates by review-id (ensure uniqueness)
-            unique_reviews = {}
-            for card in review_cards:
-                try:
-                    review_id = card.get_attribute("data-review-id")
-                    if review_id not in unique_reviews:
-                        unique_reviews[review_id] = card
-                except Exception:
-                    continue
-
-            st.write(f"🔍 Unique reviews found: {len(unique_reviews)}")
-
-        except Exception as e:
-            st.error(f"Error during scroll or extraction: {e}")
-
-        # Export all collected reviews to CSV
-        import pandas as pd
-        from datetime import timedelta
-
-        def parse_relative_date(date_text):
-            today = datetime.today()
-            match = re.search(r'\d+', date_text)
-            if not match:
-                return ""
-            num = int(match.group())
-
-            if "day" in date_text:
-                return (today - timedelta(days=num)).date()
-            elif "week" in date_text:
-                return (today - timedelta(weeks=num)).date()
-            elif "month" in date_text:
-                return (today - timedelta(days=30 * num)).date()
-            elif "year" in date_text:
-                return (today - timedelta(days=365 * num)).date()
-            else:
-                return ""
-
-        debug_mode = True  # Set to False to disable debug logging
-
-        def is_valid_comment(text):
-            if not text or len(text.strip()) < 5:
-                return False
-            lower = text.lower()
-            if "response from the owner" in lower:
-                return False
-            # Remove typical punctuation and whitespace
-            cleaned = re.sub(r"[^\w]", "", text)
-            if not cleaned or len(cleaned) < 3:
-                return False
-            # If it ends with an ellipsis and contains no words, likely junk
-            if text.strip().endswith("…") and not re.search(r"[a-zA-Z]", text):
-                return False
-            return True
-
-        # Build review data list
-        data = []
-        for i, card in enumerate(unique_reviews.values()):
-            reviewer = card.find_element(By.CLASS_NAME, 'd4r55').text
-            rating = card.find_element(By.CLASS_NAME, 'kvMYJc').get_attribute('aria-label')
             try:
-                try:
+                wait_for_selector(driver, '.DU9Pgb', 15)  # Class for business name title
+                st.success("Page loaded successfully.")
+                st.write("Page title:", driver.title)
+            except Exception as e:
+                st.error("❌ Failed to load the page. Please check the URL or internet connection.")
+                return
+
+            # Attempt to scroll and collect multiple reviews
+            try:
+                st.info("Scrolling to load all reviews...")
+                scrollable_div = wait_for_selector(driver, 'div.m6QErb.DxyBCb', 10)
+                # The browser drives its own scroll loop and reports back once the list stops growing
+                driver.set_script_timeout(180)
+                loaded_count = driver.execute_async_script(
+                    SCROLL_REVIEWS_JS,
+                    scrollable_div,
+                    2500,     # ms without new cards before the panel is scrolled again
+                    3,        # Rounds in a row without new cards before the list counts as fully loaded
+                    200,      # Safety cap on scroll attempts
+                    170000,   # Overall deadline in ms, kept under the script timeout
+                )
+
+                st.success(f"Scrolling complete. Reviews loaded: {loaded_count}")
+
+                # Expand all "More" buttons to get full text; one call clicks them and returns once they are gone
+                driver.set_script_timeout(10)
+                remaining_more_buttons = driver.execute_async_script(EXPAND_REVIEWS_JS, 5000)
+                if remaining_more_buttons:
+                    st.caption(f"{remaining_more_buttons} reviews could not be expanded; their visible text is kept.")
+
+                # Harvest every unique card's fields in a single in-page pass (duplicates by review-id are dropped in-page)
+                unique_reviews = json.loads(driver.execute_script(REVIEW_HARVEST_JS))
+
+                st.write(f"🔍 Unique reviews found: {len(unique_reviews)}")
+
+            except Exception as e:
+                st.error(f"Error during scroll or extraction: {e}")
+
+            debug_mode = True  # Set to False to disable debug logging
+            # Debug entries are collected in memory and written to the log file once, after the review loop
+            debug_lines = []
+
+            def is_valid_comment(text):
+                if not text or len(text.strip()) < 5:
+                    return False
+                lower = text.lower()
+                if "response from the owner" in lower:
+                    return False
+                # Remove typical punctuation and whitespace
+                cleaned = _NONWORD_RE.sub("", text)
+                if not cleaned or len(cleaned) < 3:
+                    return False
+                # If it ends with an ellipsis and contains no words, likely junk
+                if text.strip().endswith("…") and not _ALPHA_RE.search(text):
+                    return False
+                return True
+
+            # Build review data list; each photo starts downloading in the background as soon as its URL is parsed,
+            # so network I/O overlaps with the rest of the extraction
+            data = []
+            image_jobs = []
+            # Start from an empty export folder so photos left by an interrupted run are never reused or linked over
+            shutil.rmtree(IMAGE_DIR, ignore_errors=True)
+            os.makedirs(IMAGE_DIR, exist_ok=True)
+            os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+            image_session = open_image_session()
+            image_pool = ThreadPoolExecutor(max_workers=IMAGE_WORKERS)
+            today = datetime.today().date()
+            try:
+                for i, row in enumerate(unique_reviews):
+                    review_id = row["id"]
+                    reviewer = row["reviewer"]
+                    rating = row["rating"]
                     text = ""
                     source = "none"
-                    if i < 29:
-                        try:
-                            wi_spans = card.find_elements(By.CLASS_NAME, 'wiI7pd')
-                            temp_text = ""
-                            for span in wi_spans:
-                                try:
-                                    span.find_element(By.XPATH, "./ancestor::div[contains(@class, 'CDe7pd')]")
-                                    continue  # Skip if inside owner block
-                                except:
-                                    temp_text = span.text
-                                    break
-                            if is_valid_comment(temp_text):
-                                text = temp_text
-                                source = "wiI7pd"
-                            else:
-                                text = ""
-                                source = "none"
-                        except:
-                            text = ""
-                            source = "none"
-                    else:
-                        try:
-                            wi_spans = card.find_elements(By.CLASS_NAME, 'wiI7pd')
-                            temp_text = ""
-                            for span in wi_spans:
-                                try:
-                                    span.find_element(By.XPATH, "./ancestor::div[contains(@class, 'CDe7pd')]")
-                                    continue  # Skip if inside owner block
-                                except:
-                                    temp_text = span.text
-                                    break
-                            if is_valid_comment(temp_text):
-                                text = temp_text
-                                source = "wiI7pd"
-                            else:
-                                text = ""
-                                source = "none"
-                        except:
-                            text = ""
-                            source = "none"
-
-                        if not text:
+                    try:
+                        if is_valid_comment(row["text"]):
+                            text = row["text"]
+                            source = "wiI7pd"
+
+                        # Deeper fallback for later reviews
+                        if i >= 29 and not text:
+                            # Structural fallback
                             try:
-                                review_id = card.get_attribute("data-review-id")
-                                all_rfdo_spans = driver.find_elements(By.CLASS_NAME, 'RfDO5c')
-                                fallback_spans = []
-                                for span in all_rfdo_spans:
-                                    try:
-                                        parent = span.find_element(By.XPATH, "./ancestor::*[@data-review-id][1]")
-                                        if parent.get_attribute("data-review-id") != review_id:
-                                            continue
-                                        # Reject span if it's inside an owner response block
-                                        try:
-                                            owner_ancestor = span.find_element(By.XPATH, "./ancestor::div[contains(@class, 'CDe7pd')]")
-                                            continue  # Skip if inside owner reply
-                                        except:
-                                            fallback_spans.append(span)
-                                    except:
-                                        continue
-                                text = " ".join(
-                                    span.text for span in fallback_spans
-                                    if span.text.strip() and "RfDO5c" not in (span.get_attribute("class") or "")
-                                )
-                                fallback_count = len(fallback_spans)
-                                source = "rfdo_global"
-                            except:
-                                text = ""
-                                fallback_count = 0
-                                source = "none"
-
-                            # New structural fallback
-                            if not text:
-                                try:
-                                    rating_el = card.find_element(By.CLASS_NAME, 'kvMYJc')
-                                    container = rating_el.find_element(By.XPATH, "./ancestor::div[@data-review-id][1]")
-                                    # Find and skip the CDe7pd owner reply block
-                                    try:
-                                        owner_block = container.find_element(By.CLASS_NAME, "CDe7pd")
-                                    except:
-                                        owner_block = None
-                                    found_texts = []
-                                    for elem in container.find_elements(By.XPATH, ".//*"):
-                                        try:
-                                            # Skip anything within the owner reply block
-                                            if owner_block and owner_block in elem.find_elements(By.XPATH, "./ancestor-or-self::*"):
-                                                continue
-                                            class_attr = elem.get_attribute("class") or ""
-                                            elem_text = elem.text.strip()
-                                            if elem_text:
-                                                found_texts.append(elem_text)
-                                        except:
-                                            continue
-                                    # After building found_texts, ensure reviews with only owner responses are skipped
-                                    if not found_texts:
+                                found_texts = driver.execute_script(STRUCTURAL_TEXTS_JS, review_id)
+                                # After building found_texts, ensure reviews with only owner responses are skipped
+                                if not found_texts:
+                                    text = ""
+                                else:
+                                    text = " ".join(found_texts)
+                                    source = "structural"
+
+                                    # Filter out structurally captured junk: reviewer names, icons, timestamps, UI tags.
+                                    # Cheapest checks run first; the lowercase ratio is only counted if the text gets that far
+                                    cleaned_text = _JUNK_RE.sub("", text)
+                                    if (
+                                        any(kw in text for kw in _JUNK_KEYWORDS)
+                                        or len(cleaned_text.split()) < 5
+                                        or sum(map(str.islower, cleaned_text)) / (len(cleaned_text) + 1) < 0.05
+                                    ):
                                         text = ""
-                                    else:
-                                        text = " ".join(found_texts)
-                                        source = "structural"
-
-                                        # Filter out structurally captured junk: reviewer names, icons, timestamps, UI tags
-                                        cleaned_text = re.sub(r"[^a-zA-Z0-9\s.,!?']", "", text)
-                                        word_count = len(cleaned_text.split())
-                                        lowercase_ratio = sum(c.islower() for c in cleaned_text) / (len(cleaned_text) + 1)
-
-                                        # Explicit junk triggers
-                                        junk_keywords = ["", "", "New", "Updated", "stars", "reviews"]
-                                        junk_detected = any(kw in text for kw in junk_keywords)
-
-                                        if word_count < 5 or lowercase_ratio < 0.05 or junk_detected:
-                                            text = ""
-                                except:
-                                    pass
-                            # Fallback #4: narrowest known container using jslog="127691"
-                            if not text:
-                                try:
-                                    review_subtree = card.find_element(By.XPATH, './/div[@jslog="127691"]')
-                                    targeted_spans = review_subtree.find_elements(By.CLASS_NAME, 'RfDO5c')
-                                    extracted = [
-                                        s.text.strip() for s in targeted_spans
-                                        if s.text.strip() and "RfDO5c" not in (s.get_attribute("class") or "")
-                                    ]
-                                    if extracted:
-                                        text = " ".join(extracted)
-                                        source = "jslog127691"
-                                except:
-                                    pass
-                    if debug_mode:
-                        with open(debug_path, "a", encoding="utf-8") as f:
-                            f.write(f"\n--- Review #{i+1} ---\n")
-                            f.write(f"Used fallback: {source}\n")
-                            f.write(f"Captured text:\n{text}\n")
-                            f.write("-" * 80 + "\n")
-                except:
-                    text = ""
-                    source = "none"
-            except:
-                text = ""
-                source = "none"
-            date = card.find_element(By.CLASS_NAME, 'rsqaWe').text
-
-            review_id = card.get_attribute("data-review-id")
-            numeric_rating = int(re.search(r'\d', rating).group())
-            parsed_date = parse_relative_date(date)
-            if not parsed_date and debug_mode:
-                with open(debug_path, "a", encoding="utf-8") as f:
-                    f.write(f"[Missing Parsed Date] Review {review_id} → Raw date: {date}\n")
-
-            image_elements = card.find_elements(By.XPATH, './/div[contains(@class, "KtCyie")]/button[contains(@style, "background-image")]')
-            image_files = []
-
-            for idx, img_el in enumerate(image_elements):
-                try:
-                    style_attr = img_el.get_attribute("style")
-                    img_url = ""
-                    if "background-image" in style_attr:
+                            except:
+                                pass
                         if debug_mode:
-                            with open(debug_path, "a", encoding="utf-8") as f:
-                                f.write(f"[Image style attr] Review {review_id} → {style_attr}\n")
-
-                        # Try matching both quoted and unquoted forms
-                        match = re.search(r'url\(["\']?(https[^"\')]+)["\']?\)', style_attr)
-                        if match:
-                            img_url = match.group(1)
-                    if img_url and "googleusercontent" in img_url:
+                            debug_lines.append(f"\n--- Review #{i+1} ---\n")
+                            debug_lines.append(f"Used fallback: {source}\n")
+                            debug_lines.append(f"Captured text:\n{text}\n")
+                            debug_lines.append("-" * 80 + "\n")
+                    except:
+                        text = ""
+                        source = "none"
+                    date = row["date"]
+
+                    numeric_rating = int(_RATING_RE.search(rating).group())
+                    parsed_date = parse_relative_date(date, today)
+                    if not parsed_date and debug_mode:
+                        debug_lines.append(f"[Missing Parsed Date] Review {review_id} → Raw date: {date}\n")
+
+                    image_files = []
+
+                    # Image URLs arrive already pulled out of the background-image styles by the harvester
+                    for idx, img_url in enumerate(row["images"]):
                         image_filename = f"img_{i+1:03d}_{idx+1}.jpg"
-                        image_path = os.path.join("exports", "google", "images", image_filename)
-                        os.makedirs(os.path.dirname(image_path), exist_ok=True)
-                        urllib.request.urlretrieve(img_url, image_path)
-                        if debug_mode:
-                            with open(debug_path, "a", encoding="utf-8") as f:
-                                f.write(f"[Image captured] Review {review_id} → {img_url}\n")
+                        image_path = os.path.join(IMAGE_DIR, image_filename)
+                        image_jobs.append((img_url, image_path, image_pool.submit(fetch_image, image_session, img_url, image_path)))
                         image_files.append(image_filename)
-                except Exception:
-                    continue
-
-            # Extract like count (updated logic)
-            like_count = 0
-            try:
-                like_span = card.find_element(By.CLASS_NAME, "pkWtMe")
-                like_text = like_span.text.strip()
-                if like_text.isdigit():
-                    like_count = int(like_text)
-            except:
-                pass  # No like count means 0
-
-            # Extract structured tags: Services, Positive tags, Negative tags, Price tags
-            services = []
-            positive_tags = []
-            negative_tags = []
-            price_tags = []
 
-            try:
-                tag_blocks = card.find_elements(By.CLASS_NAME, 'RfDO5c')
-                current_label = ""
-                for tag in tag_blocks:
-                    tag_text = tag.text.strip()
-                    if tag_text.lower() in ["services", "positive", "negative", "price"]:
-                        current_label = tag_text.lower()
-                        continue
-                    elif current_label == "services":
-                        services.append(tag_text)
-                    elif current_label == "positive":
-                        positive_tags.append(tag_text)
-                    elif current_label == "negative":
-                        negative_tags.append(tag_text)
-                    elif current_label == "price":
-                        price_tags.append(tag_text)
-                    else:
-                        if debug_mode:
-                            with open(debug_path, "a", encoding="utf-8") as f:
-                                f.write(f"[Unrecognized tag under label '{current_label or 'none'}']: {tag_text}\n")
-            except:
-                pass
+                    # Extract like count (updated logic)
+                    like_count = 0
+                    like_text = row["likes"].strip()
+                    if like_text.isdigit():
+                        like_count = int(like_text)
+
+                    # Structured tags: Services, Positive tags, Negative tags, Price tags (classified by the harvester)
+                    services = row["tags"]["services"]
+                    positive_tags = row["tags"]["positive"]
+                    negative_tags = row["tags"]["negative"]
+                    price_tags = row["tags"]["price"]
+                    if debug_mode:
+                        for tag_text in row["unlabeledTags"]:
+                            debug_lines.append(f"[Unrecognized tag under label 'none']: {tag_text}\n")
+
+                    # Check if owner responded
+                    owner_responded = row["owner"]
+
+                    # Row values follow REVIEW_COLUMNS order
+                    data.append([
+                        f"R{len(data)+1:03d}",
+                        reviewer,
+                        rating,
+                        numeric_rating,
+                        date,
+                        parsed_date,
+                        bool(parsed_date),
+                        clean_final_text(text),
+                        len(image_files),
+                        ", ".join(image_files),
+                        like_count,
+                        ", ".join(services),
+                        ", ".join(positive_tags),
+                        ", ".join(negative_tags),
+                        ", ".join(price_tags),
+                        owner_responded,
+                        business_name,
+                    ])
+            except BaseException:
+                # The run failed or was stopped: drop queued downloads so nothing keeps writing into IMAGE_DIR
+                image_pool.shutdown(wait=True, cancel_futures=True)
+                raise
+            finally:
+                # Waits for the downloads still in flight, then releases the pool threads and pooled connections
+                image_pool.shutdown(wait=True)
+                image_session.close()
+
+            # Drop any downloads that failed from the review rows
+            saved_paths = {image_path for _, image_path, future in image_jobs if future.result()}
+            # Without harvested reviews the run stops below before any upload, so no log file is left behind
+            if debug_mode and data:
+                for img_url, image_path, _ in image_jobs:
+                    status = "Image captured" if image_path in saved_paths else "Image download failed"
+                    debug_lines.append(f"[{status}] {os.path.basename(image_path)} → {img_url}\n")
+                with open(debug_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+                    f.writelines(debug_lines)
+            saved_files = {os.path.basename(path) for path in saved_paths}
+            # Finalize each row's image columns against the photos that actually downloaded, before any export
+            image_count_col = REVIEW_COLUMNS.index("ImageCount")
+            image_files_col = REVIEW_COLUMNS.index("ImageFiles")
+            for review in data:
+                image_files = [name for name in review[image_files_col].split(", ") if name in saved_files]
+                review[image_count_col] = len(image_files)
+                review[image_files_col] = ", ".join(image_files)
+
+            # Export to CSV and provide download options
+            if data:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"{sanitized_business_name}_reviews_{timestamp}.csv"
+                if zip_and_send:
+                    # The CSV only needs to exist inside the Completed Reports ZIP, so keep it in memory
+                    csv_buffer = io.StringIO(newline="")
+                    write_review_csv(csv_buffer, data)
+                else:
+                    with open(filename, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+                        write_review_csv(f, data)
+
+                parquet_filename = filename.replace(".csv", ".parquet")
+                if export_parquet:
+                    try:
+                        write_review_parquet(data, parquet_filename)
+                    except ImportError:
+                        st.warning("Parquet export skipped: pyarrow is not installed.")
+            else:
+                st.warning("No review data available for export.")
+                return  # Stop processing if no data
+
+            # Create and upload ZIP of image files
+            import zipfile
+
+            zip_path = f"{sanitized_business_name}_images_{timestamp}.zip"
+            # Every downloaded photo path is already known, so zip them in name order without walking the folder
+            image_paths = sorted(saved_paths)
+
+            # Photos are already compressed (JPG/PNG/WebP), so they are stored as-is rather than deflated again.
+            # The output can be a path or a writable stream such as an entry of another ZIP
+            def create_zip_from_images(image_paths, output_zip_path):
+                with zipfile.ZipFile(output_zip_path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as zipf:
+                    for file_path in image_paths:
+                        zipf.write(file_path, os.path.basename(file_path), compress_type=zipfile.ZIP_STORED)
+                return output_zip_path
+
+            if image_paths and not zip_and_send:
+                zip_result = create_zip_from_images(image_paths, zip_path)
+                shutil.rmtree(IMAGE_DIR, ignore_errors=True)
+
+            # Handle ZIP and upload logic based on zip_and_send toggle
+            if zip_and_send:
+                combined_zip_name = f"{sanitized_business_name}_Completed_{timestamp}.zip"
+                # CSV text compresses well even at the fastest level; the images ZIP and Parquet file are already compact.
+                # Both the CSV and the nested images ZIP are written straight into the archive, never to disk on their own
+                with zipfile.ZipFile(combined_zip_name, 'w', allowZip64=True) as zipf:
+                    zipf.writestr(filename, csv_buffer.getvalue().encode("utf-8"), compress_type=zipfile.ZIP_DEFLATED, compresslevel=1)
+
+                    if image_paths:
+                        # A bare name would stamp the entry 1980-01-01; give it the real creation time
+                        images_info = zipfile.ZipInfo(zip_path, date_time=datetime.now().timetuple()[:6])
+                        with zipf.open(images_info, 'w', force_zip64=True) as images_entry:
+                            create_zip_from_images(image_paths, images_entry)
+                        shutil.rmtree(IMAGE_DIR, ignore_errors=True)
+
+                    if os.path.exists(parquet_filename):
+                        zipf.write(parquet_filename, arcname=parquet_filename, compress_type=zipfile.ZIP_STORED)
+                        os.remove(parquet_filename)
+
+                completed_folder_id = "1zNFK4qrevy7lMTvXo3BHXckUmo0vbJ9a"
+                final_zip_link = upload_file_to_drive(combined_zip_name, folder_id=completed_folder_id)
+                st.write("📤 Completed ZIP uploaded to Completed Reports folder:", final_zip_link)
+
+                os.remove(combined_zip_name)
+            else:
+                # Proceed with normal individual uploads if zip_and_send is not selected
+                csv_link = upload_file_to_drive(filename, folder_id="1npT9OnZ8SwKTiVKRpWS2U8gxosooPTkZ")
+                st.write("📤 CSV uploaded to Google Drive:", csv_link)
+                os.remove(filename)
 
-            # Check if owner responded
-            owner_responded = False
-            try:
-                card.find_element(By.CLASS_NAME, "CDe7pd")
-                owner_responded = True
-            except:
-                owner_responded = False
-
-            data.append({
-                "ReviewUID": f"R{len(data)+1:03d}",
-                "Reviewer": reviewer,
-                "Rating": rating,
-                "RatingValue": numeric_rating,
-                "DateRaw": date,
-                "DateParsed": parsed_date,
-                "DateParseSuccess": bool(parsed_date),
-                "Review": clean_final_text(text),
-                "ImageCount": len(image_files),
-                "ImageFiles": ", ".join(image_files),
-                "LikeCount": like_count,
-                "Services": ", ".join(services),
-                "PositiveTags": ", ".join(positive_tags),
-                "NegativeTags": ", ".join(negative_tags),
-                "PriceTags": ", ".join(price_tags),
-                "OwnerResponded": owner_responded,
-                "ClientName": business_name,
-            })
-
-        # Export to CSV and provide download options
-        if data:
-            df = pd.DataFrame(data)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{sanitized_business_name}_reviews_{timestamp}.csv"
-            df.to_csv(filename, index=False)
-        else:
-            st.warning("No review data available for export.")
-            return  # Stop processing if no data
-
-        # Create and upload ZIP of image files
-        import zipfile
-
-        image_folder_path = os.path.join("exports", "google", "images")
-        zip_path = f"{sanitized_business_name}_images_{timestamp}.zip"
-
-        def create_zip_from_images(image_folder_path, output_zip_path):
-            with zipfile.ZipFile(output_zip_path, 'w') as zipf:
-                for root, _, files in os.walk(image_folder_path):
-                    for file in files:
-                        if file.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')):
-                            file_path = os.path.join(root, file)
-                            arcname = file
-                            zipf.write(file_path, arcname)
-            return output_zip_path
-
-        if os.path.exists(image_folder_path):
-            zip_result = create_zip_from_images(image_folder_path, zip_path)
-            import shutil
-            shutil.rmtree(image_folder_path, ignore_errors=True)
-
-        # Close browser for now
-        driver.quit()
-
-        # Handle ZIP and upload logic based on zip_and_send toggle
-        if zip_and_send:
-            combined_zip_name = f"{sanitized_business_name}_Completed_{timestamp}.zip"
-            with zipfile.ZipFile(combined_zip_name, 'w') as zipf:
-                if os.path.exists(filename):
-                    zipf.write(filename, arcname=filename)
-                    os.remove(filename)
+                if os.path.exists(parquet_filename):
+                    parquet_link = upload_file_to_drive(parquet_filename, folder_id="1npT9OnZ8SwKTiVKRpWS2U8gxosooPTkZ")
+                    st.write("📤 Parquet uploaded to Google Drive:", parquet_link)
+                    os.remove(parquet_filename)
 
                 if os.path.exists(zip_path):
-                    zipf.write(zip_path, arcname=zip_path)
+                    zip_link = upload_file_to_drive(zip_path, folder_id="1-GUlZL7EFxux19o__sfBax4F1snCQgdQ")
+                    st.write("📤 Images ZIP uploaded to Google Drive:", zip_link)
+                    st.caption("⚠️ Google Drive may not preview ZIP files correctly. Download to view contents.")
                     os.remove(zip_path)
 
-            completed_folder_id = "1zNFK4qrevy7lMTvXo3BHXckUmo0vbJ9a"
-            final_zip_link = upload_file_to_drive(combined_zip_name, folder_id=completed_folder_id)
-            st.write("📤 Completed ZIP uploaded to Completed Reports folder:", final_zip_link)
-
-            os.remove(combined_zip_name)
-        else:
-            # Proceed with normal individual uploads if zip_and_send is not selected
-            csv_link = upload_file_to_drive(filename, folder_id="1npT9OnZ8SwKTiVKRpWS2U8gxosooPTkZ")
-            st.write("📤 CSV uploaded to Google Drive:", csv_link)
-            os.remove(filename)
-
-            if os.path.exists(zip_path):
-                zip_link = upload_file_to_drive(zip_path, folder_id="1-GUlZL7EFxux19o__sfBax4F1snCQgdQ")
-                st.write("📤 Images ZIP uploaded to Google Drive:", zip_link)
-                st.caption("⚠️ Google Drive may not preview ZIP files correctly. Download to view contents.")
-                os.remove(zip_path)
-
-        # Always upload debug file to Debug Logs folder, regardless of ZIP export toggle
-        debug_folder_id = "1EtBEoQoCeAGzMo9KQD_pkHJoBhBTnXbm"
-        if os.path.exists(debug_path):
-            debug_link = upload_file_to_drive(debug_path, folder_id=debug_folder_id)
-            st.write("📤 Debug log uploaded to Debug Logs folder:", debug_link)
-            os.remove(debug_path)
+            # Always upload debug file to Debug Logs folder, regardless of ZIP export toggle
+            debug_folder_id = "1EtBEoQoCeAGzMo9KQD_pkHJoBhBTnXbm"
+            if os.path.exists(debug_path):
+                debug_link = upload_file_to_drive(debug_path, folder_id=debug_folder_id)
+                st.write("📤 Debug log uploaded to Debug Logs folder:", debug_link)
+                os.remove(debug_path)
+        finally:
+            lock.release()
 
 
 if __name__ == "__main__":